@@ -4,49 +4,58 @@
 # This program was used to create figure 6.2 of the manuscript.
 # It plots the number of receptors R in the system during an example simulation.
 
+import re
 import numpy as np
-from scipy.special import factorial
 import matplotlib.pyplot as plt
-from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 
+# numba compiles the loop of the Gillespie algorithm, 
+# without numba a vectorised numpy version is used
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """replaces the decorator of numba and returns the function unchanged"""
+        return(lambda function: function)
+
 ###################################################
 ######## functions ################################
 ###################################################
 
-def next_values(a0,a,r1,r2):
-    """returns values for the next reaction like time difference and reaction according to Gillespie"""
+@njit(cache=True)
+def next_values(a0,csum,tau,r2):
+    """returns values for the next reaction like time difference and reaction according to Gillespie,
+    csum is the cumulative sum of the ai and tau a standard exponential random number"""
     
-    # calculate next time
-    new_time_difference = (1/a0)*np.log(1/r1)
+    # calculate next time, tau is distributed like log(1/r1) for a uniform r1
+    new_time_difference = tau/a0
     
     # choose next reaction R_mu under the condition that
     # sum(a[i], i=0, mu-1) < r2*a0 <= sum(a[i], i=0, mu)
-    mu = 0
-    N = r2*a0 - a[mu] 
-    
-    while N > 0:
-        mu += 1
-        N = N - a[mu]
+    # by binary search in the cumulative sum
+    mu = np.searchsorted(csum, r2*a0)
+    mu = min(mu, len(csum)-1) # in case of rounding errors in a0
     
     return(new_time_difference, mu)
     
+@njit(cache=True)
 def calculate_hi(n,m):
-    """calculates the hi with the help of binomial coeff and factorial() 
+    """calculates the hi as falling factorial n*(n-1)*...*(n-m+1)
     since hi is defined as total number of distinct 
     combinations of Ri reactant molecules"""
     
-    b=[0]*(n+1)
-    b[0]=1
-    for i in range(1,n+1):
-        b[i]=1
-        j=i-1
-        while j>0:
-            b[j]+=b[j-1]
-            j-=1
-    hi = b[m]*factorial(m)
+    hi = 1
+    for k in range(m):
+        hi *= n-k
     return(hi)
     
+# one term of a reaction like '2X1' with stoichiometry and name of species
+REACTION_TERM = re.compile(r"(\d*)X(\d+)")
+
 def reactions_stoch(reactions):
     """gets a string of several reactions and outputs the stoichiometry array
     of substrates and products
@@ -56,159 +65,102 @@ def reactions_stoch(reactions):
     only use symbols like '->' and '+', dont use spaces
     """
     
-    # important variables
-    substrates = [] # string reactions is splitted into substrates and products
-    products = []
-    sub_without_plus = [] # each subtrate is separated by '+'
-    prod_without_plus = []
-    sub_number_reaction = [] # list with items like [number of species, name of species]
-    prod_number_reaction = []
-    total_number_species = 0 # number of all species to create array
-    
-    # remove symobls like '+', '->', ',' and split it into substrates and products 
-    one_reaction = reactions.split(",")
-    for i in one_reaction:
-        s_p = i.split("->")
-        substrates.append(s_p[0])
-        products.append(s_p[1])
-
-    for i in substrates:
-        sub_without_plus.append(i.split("+"))
-    for i in products:
-        prod_without_plus.append(i.split("+"))
-    
-    # split each item into [number of species, name of species]
-    for i in sub_without_plus:
-        sub_one_reaction = []
-        for j in i:
-            number_reaction = []
-            j = j.split("X")
-            if j[0].isdigit():
-                number_reaction.append(int(j[0]))
-            else:
-                number_reaction.append(1)
-            if len(j) == 2:
-                number_reaction.append(int(j[1]))
-                if int(j[1]) > total_number_species:
-                    total_number_species = int(j[1])
-            if len(number_reaction) == 2:
-                sub_one_reaction.append(number_reaction)
-        if len(sub_one_reaction) >= 1:
-            sub_number_reaction.append(sub_one_reaction)
-    
-    for i in prod_without_plus:
-        prod_one_reaction = []
-        for j in i:
-            number_reaction = []
-            j = j.split("X")
-            if j[0].isdigit():
-                number_reaction.append(int(j[0]))
-            else:
-                number_reaction.append(1)
-            if len(j) == 2:
-                number_reaction.append(int(j[1]))
-                if int(j[1]) > total_number_species:
-                    total_number_species = int(j[1])
-            if len(number_reaction) == 2:
-                prod_one_reaction.append(number_reaction)
-        if len(prod_one_reaction) >= 1:
-            prod_number_reaction.append(prod_one_reaction)
-    
-    # create arrays for the stoichiometry of substrates and products
-    sub_stoch = np.zeros((len(one_reaction), total_number_species), int)
-    prod_stoch = np.zeros((len(one_reaction), total_number_species), int)
+    # split the string into reactions and each reaction into substrates and products
+    one_reaction = [i.split("->") for i in reactions.split(",")]
+
+    # number of all species to create array
+    total_number_species = max(int(species) for number, species in REACTION_TERM.findall(reactions))
     
-    # fill the arrays with the number of species
-    for reaction in range(len(sub_number_reaction)):
-        for species in sub_number_reaction[reaction]:
-            sub_stoch[reaction][species[1]-1] = int(-species[0])
+    # create arrays for the stoichiometry of substrates and products,
+    # int32 like the numbers of molecules in the Gillespie algorithm
+    sub_stoch = np.zeros((len(one_reaction), total_number_species), np.int32)
+    prod_stoch = np.zeros((len(one_reaction), total_number_species), np.int32)
     
-    for reaction in range(len(prod_number_reaction)):
-        for species in prod_number_reaction[reaction]:
-            prod_stoch[reaction][species[1]-1] = int(species[0])
+    # fill the arrays with the number of species, a missing number means 1
+    for reaction, (substrates, products) in enumerate(one_reaction):
+        for number, species in REACTION_TERM.findall(substrates):
+            sub_stoch[reaction, int(species)-1] -= int(number or 1)
+        for number, species in REACTION_TERM.findall(products):
+            prod_stoch[reaction, int(species)-1] += int(number or 1)
     return(sub_stoch, prod_stoch)
 
+def double_size(array):
+    """returns a copy of array with twice the number of rows,
+    the new rows are not initialised"""
+
+    new_array = np.empty((2*array.shape[0],)+array.shape[1:], dtype=array.dtype)
+    new_array[:array.shape[0]] = array
+    return(new_array)
+
+def reactant_lists(sub_stoch):
+    """gets the stoichiometry of the substrates and outputs only the reactants
+    of each reaction in compressed form, since most entries of sub_stoch are 0
+    
+    the reactants of reaction i are reactant_species[reactant_ptr[i]:reactant_ptr[i+1]]
+    with the stoichiometry reactant_order[reactant_ptr[i]:reactant_ptr[i+1]]
+    """
+
+    reactions, reactant_species = np.nonzero(sub_stoch)
+    reactant_order = np.absolute(sub_stoch[reactions, reactant_species])
+
+    reactant_ptr = np.zeros(np.shape(sub_stoch)[0]+1, dtype=np.int64)
+    np.cumsum(np.bincount(reactions, minlength=np.shape(sub_stoch)[0]), out=reactant_ptr[1:])
+    return(reactant_ptr, reactant_species, reactant_order)
+
 ###################################################
 ######## Gillespie algorithm ######################
 ###################################################
-    
-def gillespie_algo(s_i, init, rates, sub_stoch, prod_stoch, tmax, n_max):
-    """generates a statistically correct trajectory of a stochastic equation
 
-    input:
-    s_i = array([s1,...,sN]) number of slots
-    init = array([w1,...,wN,e1,...,eN,p]) number of molecules of each species
-    rates = array([c1,..cM]) rates of each reaction
-    sub_stoch, prod_stoch = stochiometry of substrates and products in matrix form
-    tmax = maximum time
-    n_max = estimated maximum number of reactions]
+@njit(cache=True, nogil=True)
+def _gillespie_core(reactant_ptr, reactant_species, reactant_order, stoch, rates,
+                    current_species, tau, r2, tmax, n_counter, current_time,
+                    store_time, store_number_molecules, average, m2, verbose):
+    """runs the loop of the Gillespie algorithm from reaction n_counter at current_time
+    until tmax or until the store arrays are full and fills them in place,
+    returns the number of occured reactions and the final time
 
-    output:
-    store_time = array([[t1],[t2],[t3],...]) current time of each intervall
-    store_number_molecules = array([[number molecules reaction 0],[number molecules reaction 0],..])
-    coefficient_variation = array([CV_1,...,CV_N]) average of coefficient of variation of each synapse
-    """
-    
-    # ****************************   
-    # step 0: initialisation
-    # ****************************
+    average and m2 are the time weighted mean and sum of squared deviations
+    of w_i, they are updated in place during the loop"""
 
-    # generate a array of two random numbers for step 2
-    r1 = np.random.random_sample(n_max)
-    r2 = np.random.random_sample(n_max)
+    number_reactions = stoch.shape[0]
+    number_species = stoch.shape[1]
 
-    # initialise constant parameters
-    stoch = sub_stoch + prod_stoch 
-    number_reactions = np.shape(stoch)[0] # number of reactions
-    number_species = np.shape(stoch)[1] # number of species
-    number_synapses = int((len(init)-1)/2)
+    n_max = store_time.shape[0] # size of the store arrays
+    number_synapses = average.shape[0]
+
+    # propensities ai and their cumulative sum, overwritten in each step
+    a = np.empty(number_reactions, dtype=np.float64)
+    csum = np.empty_like(a)
 
-    # initialise current parameters
-    current_time = 0
-    current_species = init # current number of molecules of each species
-    n_counter = 0 # number of already occured reactions
-    
-    # initialise variables to store time and molecule numbers
-    store_time = np.zeros(n_max)
-    store_time[n_counter] = current_time
-    store_number_molecules = np.zeros((n_max, number_species))
-    store_number_molecules[n_counter,:] = current_species 
-    store_time_difference = np.zeros((n_max,number_synapses)) 
-    
     while (current_time < tmax) and (n_counter < n_max-1):
-        
+
         # ****************************   
         # step 1: calculate ai and a0
         # ****************************   
 
-        a = np.ones((number_reactions,1))
-
+        a0 = 0.0 # a0 and the cumulative sum are accumulated with the ai
         for i in range(number_reactions):
-            hi = 1  # h1 is defined as the number of distinct 
-                    # combinations of Ri reactant molecules 
-            for j in range(number_species):
-                # check whether the reactant is involved in this reaction
-                if sub_stoch[i,j] == 0:
-                    continue
-                else:
-                    # check the reactant has molecules available
-                    if current_species[j] <= 0: 
-                        hi = 0
-                        continue
-                    else:
-                        hi *= calculate_hi\
-                        (int(current_species[j]),np.absolute(sub_stoch[i,j]))
-                        
+            hi = 1.0 # h1 is defined as the number of distinct 
+                     # combinations of Ri reactant molecules 
+            # only the reactants of this reaction, hi is 0 if 
+            # a reactant has not enough molecules available
+            for k in range(reactant_ptr[i], reactant_ptr[i+1]):
+                hi *= calculate_hi(current_species[reactant_species[k]], reactant_order[k])
+
             a[i] = hi*rates[i]
-            
-        a0 = sum(a)
+            a0 += a[i]
+            csum[i] = a0
 
         # ****************************   
         # step 2: calculate the next time difference and reaction
         # ****************************   
-        new_time_difference,next_r = next_values(a0,a,r1[n_counter],r2[n_counter])
-        store_time_difference[n_counter,:] = np.zeros(number_synapses)
-        store_time_difference[n_counter,:] += new_time_difference 
+        new_time_difference,next_r = next_values(a0,csum,tau[n_counter],r2[n_counter])
+
+        # update average and m2 of w_i with weight new_time_difference (Welford)
+        for j in range(number_synapses):
+            delta = current_species[j] - average[j]
+            average[j] += delta*new_time_difference/(current_time + new_time_difference)
+            m2[j] += new_time_difference*delta*(current_species[j] - average[j])
 
         # ****************************   
         # step 3: update the system
@@ -216,30 +168,168 @@ def gillespie_algo(s_i, init, rates, sub_stoch, prod_stoch, tmax, n_max):
 
         # update time, number species, counter
         current_time += new_time_difference 
-        current_species += np.transpose(stoch[next_r,:])
+        for j in range(number_species):
+            current_species[j] += stoch[next_r,j]
         n_counter += 1
 
         # store current system
         store_time[n_counter] = current_time
         store_number_molecules[n_counter,:] = current_species 
-        
-        print("time: ", current_time, "n: ", n_counter)
+
+        # output the progress every 1024 reactions
+        if verbose and (n_counter & 1023) == 0:
+            print("time: ", current_time, "n: ", n_counter)
+
+    return(n_counter, current_time)
+
+def _gillespie_numpy(reactant_ptr, reactant_species, reactant_order, stoch, rates,
+                     current_species, tau, r2, tmax, n_counter, current_time,
+                     store_time, store_number_molecules, average, m2, verbose):
+    """same as _gillespie_core, but calculates the ai with numpy operations 
+    over all reactions instead of loops, used if numba is not installed
+
+    average and m2 are not updated in the loop, they are calculated
+    afterwards from the stored trajectory"""
+
+    number_reactions = stoch.shape[0]
+
+    # first reactant of each reaction with reactants
+    has_reactants = np.diff(reactant_ptr) > 0
+    reactant_first = reactant_ptr[:-1][has_reactants]
+    max_order = reactant_order.max()
+
+    n_max = store_time.shape[0] # size of the store arrays
+
+    # propensities ai and their cumulative sum, overwritten in each step
+    a = np.empty(number_reactions, dtype=np.float64)
+    csum = np.empty_like(a)
+
+    while (current_time < tmax) and (n_counter < n_max-1):
+
+        # ****************************   
+        # step 1: calculate ai and a0
+        # ****************************   
+
+        # hi is the falling factorial of the number of each reactant, 
+        # it is 0 if a reactant has not enough molecules available
+        hi = np.ones(number_reactions)
+        reactant_number = current_species[reactant_species]
+        for k in range(max_order):
+            hi[has_reactants] *= np.multiply.reduceat(
+                np.where(reactant_order > k, reactant_number - k, 1), reactant_first)
+        np.multiply(hi, rates, out=a)
+
+        a0 = a.sum()
+        np.cumsum(a, out=csum)
+
+        # ****************************   
+        # step 2: calculate the next time difference and reaction
+        # ****************************   
+        new_time_difference,next_r = next_values(a0,csum,tau[n_counter],r2[n_counter])
+
+        # ****************************   
+        # step 3: update the system
+        # ****************************   
+
+        # update time, number species, counter
+        current_time += new_time_difference 
+        current_species += stoch[next_r]
+        n_counter += 1
+
+        # store current system
+        store_time[n_counter] = current_time
+        store_number_molecules[n_counter,:] = current_species 
+
+        # output the progress every 1024 reactions
+        if verbose and (n_counter & 1023) == 0:
+            print("time: ", current_time, "n: ", n_counter)
+
+    return(n_counter, current_time)
+
+def gillespie_algo(s_i, init, rates, sub_stoch, prod_stoch, tmax, n_max, rng=None, verbose=False):
+    """generates a statistically correct trajectory of a stochastic equation
+
+    input:
+    s_i = array([s1,...,sN]) number of slots
+    init = array([w1,...,wN,e1,...,eN,p]) number of molecules of each species
+    rates = array([c1,..cM]) rates of each reaction
+    sub_stoch, prod_stoch = stochiometry of substrates and products in matrix form
+    tmax = maximum time
+    n_max = estimated maximum number of reactions, the arrays are doubled if it is exceeded]
+    rng = numpy random generator, a new one is created if None
+    verbose = output time and number of reactions during the simulation
+
+    output:
+    store_time = array([[t1],[t2],[t3],...]) current time of each intervall
+    store_number_molecules = array([[number molecules reaction 0],[number molecules reaction 0],..])
+    coefficient_variation = array([CV_1,...,CV_N]) average of coefficient of variation of each synapse
+    """
+    
+    # ****************************   
+    # step 0: initialisation
+    # ****************************
+
+    # generate arrays of random numbers for step 2,
+    # an exponential one for the time and a uniform one for the reaction
+    if rng is None:
+        rng = np.random.default_rng()
+    tau = rng.standard_exponential(n_max)
+    r2 = rng.random(n_max)
+
+    # initialise current parameters
+    current_time = 0.0
+    n_counter = 0 # number of already occured reactions
+
+    # initialise constant parameters, numbers of molecules are stored as int32
+    # (no conversion if init and the stoichiometry are int32 already)
+    stoch = np.ascontiguousarray(sub_stoch + prod_stoch, dtype=np.int32)
+    current_species = np.array(init, dtype=np.int32) # current number of molecules of each species
+    number_species = np.shape(stoch)[1] # number of species
+    number_synapses = int((len(init)-1)/2)
+    reactant_ptr, reactant_species, reactant_order = reactant_lists(sub_stoch)
+
+    # initialise variables to store time and molecule numbers
+    store_time = np.empty(n_max)
+    store_time[n_counter] = current_time
+    store_number_molecules = np.empty((n_max, number_species), dtype=np.int32)
+    store_number_molecules[n_counter,:] = current_species
+
+    # time weighted mean and sum of squared deviations of w_i for the CV
+    average = np.zeros(number_synapses)
+    m2 = np.zeros(number_synapses)
+
+    # run the loop of the algorithm as compiled code if numba is installed
+    if NUMBA_AVAILABLE:
+        core = _gillespie_core
+    else:
+        core = _gillespie_numpy
+    while True:
+        n_counter, current_time = core(reactant_ptr, reactant_species, reactant_order, 
+            stoch, rates, current_species, tau, r2, tmax, n_counter, current_time,
+            store_time, store_number_molecules, average, m2, verbose)
+        if current_time >= tmax:
+            break
+
+        # the store arrays are full, so double them and the random numbers
+        store_time = double_size(store_time)
+        store_number_molecules = double_size(store_number_molecules)
+        tau = np.append(tau, rng.standard_exponential(len(tau)))
+        r2 = np.append(r2, rng.random(len(r2)))
+
+    if not NUMBA_AVAILABLE:
+        # the numpy version does not update average and m2 in the loop,
+        # so calculate them once from the time differences of the trajectory
+        time_difference = np.diff(store_time[:n_counter+1])[:,None]
+        mol_cv = store_number_molecules[:n_counter,:number_synapses]
+        average = (time_difference*mol_cv).sum(axis=0)/current_time
+        m2 = (time_difference*(mol_cv - average)**2).sum(axis=0)
         
     # prepare the final output
     store_time = store_time[:n_counter]
     store_number_molecules = store_number_molecules[:n_counter,:]
-    store_time_difference = store_time_difference[:n_counter,:]
     
-    # calculate average of coefficient of variation
-    
-    # delete column for e_i and p since only w_i is relevant
-    mol_cv = store_number_molecules[:,:4]
-    
-    average = sum(store_time_difference*mol_cv)
-    average /= current_time 
-    
-    coefficient_variation = np.sqrt(sum((mol_cv - average)**2*\
-                (store_time_difference/current_time)))*100/average
+    # calculate average of coefficient of variation of w_i
+    coefficient_variation = np.sqrt(m2/current_time)*100/average
 
     return(store_time, store_number_molecules, coefficient_variation)
 
@@ -257,78 +347,88 @@ all_reactions = reactions_alpha + reactions_beta + reactions_delta_gamma
 sub_stoch, prod_stoch = \
 reactions_stoch(all_reactions) 
 
-for start in [0,200,400,600,800]:
-    # define the initial conditions
+# define the initial conditions
 
-    s_i = np.array([20,40,60,80]) # set number of slots
-    e_i = deepcopy(s_i)
-    s = np.sum(s_i)
-    number_synapses = len(s_i)
+s_i = np.array([20,40,60,80]) # set number of slots
+e_i = s_i.copy()
+s = np.sum(s_i)
+number_synapses = len(s_i)
 
-    phi = 2.67
-    F = 0.9 # set F for calculating alpha
-    beta = 60/43 # set beta
-    alpha = beta/(phi*s*(1-F)) # set alpha
-    delta = 1/14 # set delta
-    gamma = delta*(s*phi-(beta/alpha)) # set gamma
+phi = 2.67
+F = 0.9 # set F for calculating alpha
+beta = 60/43 # set beta
+alpha = beta/(phi*s*(1-F)) # set alpha
+delta = 1/14 # set delta
+gamma = delta*(s*phi-(beta/alpha)) # set gamma
 
-    p = round(gamma/delta) # set p
+p = round(gamma/delta) # set p
 
-    tmax = 60 # set the end time 
-    n_max = 40000 # estimate n_max for later arrays
-    times_sim_av = 1 # number of repeated simulations for average
+tmax = 60 # set the end time 
+n_max = 40000 # estimate n_max for later arrays
+times_sim_av = 1 # number of repeated simulations for average
+starts = [0,200,400,600,800] # initial number of pool receptors
 
-    # prepare the rates 
-    rates = np.ones(len(s_i))*alpha
-    rates = np.append(rates,np.ones(len(s_i))*beta)
-    rates = np.append(rates,delta)
-    rates = np.append(rates,gamma)
+# prepare the rates 
+rates = np.ones(len(s_i))*alpha
+rates = np.append(rates,np.ones(len(s_i))*beta)
+rates = np.append(rates,delta)
+rates = np.append(rates,gamma)
 
-    # prepare initial number of molecules of each species according to filling fraction
-    init1 = np.array([0,0,0,0,20,40,60,80,start])
+def run_one(start, seed):
+    """runs one simulation starting with start pool receptors 
+    and its own random generator"""
 
+    # prepare initial number of molecules of each species according to filling fraction
+    init1 = np.array([0,0,0,0,20,40,60,80,start], dtype=np.int32)
+    init = init1.copy()
+
+    rng = np.random.default_rng(seed)
+    return(gillespie_algo(s_i, init, rates, sub_stoch, prod_stoch, tmax, n_max, rng))
+
+# the simulations are independent, so they run in parallel threads 
+# (the compiled loop releases the GIL), each with its own seed
+seeds = iter(np.random.SeedSequence().spawn(len(starts)*times_sim_av))
+with ThreadPoolExecutor() as executor:
+    simulations = [[executor.submit(run_one, start, next(seeds)) 
+                    for counter_simulation in range(times_sim_av)] for start in starts]
+
+    # output the information how many simulations are already done
+    all_simulations = [simulation for simulations_start in simulations 
+                       for simulation in simulations_start]
+    for counter_done, simulation in enumerate(as_completed(all_simulations), 1):
+        print("counter simulation: ", counter_done, "of", len(all_simulations))
+
+for start, simulations_start in zip(starts, simulations):
     # check the result concerning CV
     cv = np.zeros(len(s_i))
 
-    counter_simulation = 0
-    while True:
-        init = deepcopy(init1)
-        if counter_simulation == times_sim_av:
-            break
-
-        # output the information how many simulations are already done
-        counter_simulation += 1
-        print("counter simulation: ", counter_simulation)
-
-        results = gillespie_algo(s_i, init, rates, sub_stoch, prod_stoch, tmax, n_max)
+    # collect the results of the finished simulations in order
+    for counter_simulation, simulation in enumerate(simulations_start, 1):
+        results = simulation.result()
         store_time = results[0]
         store_molecules = results[1]
         coefficient_variation = results[2]
 
         cv += coefficient_variation
 
-        # txt files for number of molecules and time
-        wi_data = open("species_"+str(start),"a+")
-        for i in store_molecules:
-            wi_data.write(str(list(i[:9]))+",\n")
-        wi_data.close()
-
-        time_data = open("time_"+str(start),"a+")
-        for i in store_time:
-            time_data.write(str(i)+"\n")
-        time_data.close()
+        # binary npy files for number of molecules and time,
+        # numbers of molecules are stored as int16 if they fit, otherwise as int32
+        sim = str(counter_simulation)
+        species = store_molecules[:,:9]
+        if species.max() <= np.iinfo(np.int16).max:
+            species = species.astype(np.int16)
+        np.save("species_"+str(start)+"_"+sim+".npy", species)
+        np.save("time_"+str(start)+"_"+sim+".npy", store_time)
 
     # calculate the average of CV of all simulations
     cv /= times_sim_av
 
-    # store CV in txt file
-    cv_data = open("cv","a+")
-    for i in cv:
-        cv_data.write(str(i)+"\n")
-    cv_data.close()
+    # store CV in txt file, one line per synapse written at once
+    with open("cv","a+") as cv_data:
+        cv_data.write("".join(str(i)+"\n" for i in cv))
 
     print("Average CV of w_i:", cv)
-    print("The results are now saved in the txt files.")
+    print("The results are now saved in the npy and txt files.")
 
 ##########################################################
 ################## plot R: Fig. 6.7 ######################
@@ -342,33 +442,18 @@ plt.rc('font', **font)
 plt.rc('font', serif='Times New Roman') 
 plt.rc('text', usetex=True)
 
-for start in [0,200,400,600,800]:
-    # extract the information from txt files
+for start in starts:
+    # extract the information from npy files
     # data of w_i
     sim = "1"
-    wi = "["
-    data = open("species_"+str(start)) # use the right name of receptor data files
-    for line in data:
-        wi += line.rstrip()
-    wi = wi[:-1] 
-    wi += "]"
-
-    data.close()
-    wi = np.array(eval(wi))
+    # use the right name of receptor data files, int32 to avoid overflow in the sum
+    wi = np.load("species_"+str(start)+"_"+sim+".npy").astype(np.int32)
     
     # data of time
-    time = np.array([])
-    data = open("time_"+str(start))
-    for line in data:
-        time = np.append(time, float(line.rstrip()))
-    data.close()
-
-    # data of r
-    r = np.delete(wi, 4, 1)
-    r = np.delete(r, 4, 1)
-    r = np.delete(r, 4, 1)
-    r = np.delete(r, 4, 1)
-    r = np.sum(r,axis=1)
+    time = np.load("time_"+str(start)+"_"+sim+".npy")
+
+    # data of r as sum of w_i and p
+    r = wi[:,:4].sum(axis=1) + wi[:,8]
     plt.plot(time, r,'k',color='black',linewidth=0.3)
     
 plt.xlabel(r'$t \; [{\rm min}]$', fontsize=12)